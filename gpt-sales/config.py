@@ -26,13 +26,20 @@ class ResearchConfiguration:
     Attributes:
         critic_model (str): Model for evaluation tasks.
         worker_model (str): Model for working/generation tasks.
+        composer_model (str): Model that writes the final report from vetted research.
+        query_gen_model (Gemini): Lightweight search-capable model for query and plan generation.
         max_search_iterations (int): Maximum search iterations allowed.
+        search_ttl_hours (int): Hours a cached grounded search response stays reusable.
+        search_min_interval_ms (int): Minimum spacing between grounded search requests.
+        search_burst (int): Grounded search requests allowed back to back before pacing starts.
     """
 
     # critic_model: str = "gemini-2.5-flash"
     # worker_model: str = "gemini-2.5-flash-lite"
     critic_model = LiteLlm(model="openai/gpt-5-mini")
     worker_model = LiteLlm(model="openai/gpt-5-mini")
+    # Report composition is synthesis, not evaluation; tune separately from the critic
+    composer_model = worker_model
     search_model = Gemini(
             model="gemini-2.5-flash",
             retry_options=genai_types.HttpRetryOptions(
@@ -40,7 +47,18 @@ class ResearchConfiguration:
             attempts=3
             )
         )
+    # Cheaper model for steps that only formulate queries/plans rather than synthesize
+    query_gen_model = Gemini(
+            model="gemini-2.5-flash-lite",
+            retry_options=genai_types.HttpRetryOptions(
+            initial_delay=3,
+            attempts=3
+            )
+        )
     max_search_iterations: int = 5
+    search_ttl_hours: int = 24
+    search_min_interval_ms: int = 500
+    search_burst: int = 1
 
 
 config = ResearchConfiguration()
\ No newline at end of file
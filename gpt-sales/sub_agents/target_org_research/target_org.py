@@ -1,12 +1,15 @@
 import datetime
+import json
 import logging
 import re
+import textwrap
 from collections.abc import AsyncGenerator
-from typing import Literal, Dict, List, Optional
+from typing import Final, Literal, Dict, List, Optional
 
-from google.adk.agents import BaseAgent, LlmAgent, LoopAgent, SequentialAgent
+from google.adk.agents import BaseAgent, LlmAgent, LoopAgent, ParallelAgent, SequentialAgent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.events import Event, EventActions
 from google.adk.planners import BuiltInPlanner
 from google.adk.tools import google_search
@@ -16,6 +19,111 @@ from google.adk.models import Gemini
 from pydantic import BaseModel, Field
 
 from ...config import config
+from ...tools.rate_limit import throttle_search_requests
+from ...tools.search_cache import search_cache_lookup_callback, search_cache_store_callback
+
+try:
+    # google-re2 gives linear-time DFA matching for the citation and stakeholder scans on large reports
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# --- Precompiled Patterns ---
+# Cite tags with the spaces/tabs before them (groups 1-2) and whitespace before punctuation
+# (group 3), rewritten in one pass. A dropped cite takes those spaces with it but never a
+# line break, so a cite that opens a line or paragraph does not merge it into the one above
+_CITATION_RE = _re_engine.compile(
+    r'([^\S\n]*)<cite\s+source\s*=\s*["\']?\s*src-(\d+)\s*["\']?\s*/?>|\s+([.,;:])'
+)
+# A capitalized multi-word name next to a job title, on either side, in research findings
+_TITLE_PATTERN = (
+    r"(?:Chief [A-Z][a-z]+ Officer|CEO|CTO|CIO|CFO|COO|CISO|CMO|CRO|CDO"
+    r"|S?E?VP|Vice President|President|Director|Head of|Manager)"
+)
+# Latin-1 letters so names like "José Müller" match; Mc/Mac/O' prefixes cover "McCarthy", "O'Brien"
+_UPPER, _LOWER = "[A-ZÀ-ÖØ-Þ]", "[a-zß-öø-ÿ]"
+_NAME_TOKEN = rf"(?:Mc|Mac|O['’])?{_UPPER}{_LOWER}+(?:-{_UPPER}{_LOWER}+)?"
+_NAME_PATTERN = rf"({_NAME_TOKEN}(?: {_UPPER}\.)?(?: {_NAME_TOKEN}){{1,2}})"
+# Between a name and its title: markdown emphasis and table pipes, a comma, bracket, colon or dash
+# (en/em included), "is/was/serves as the", and an optional possessive such as "Apple's"
+_NAME_TITLE_SEPARATOR = (
+    r"[*_]{0,2}[^\S\n]*(?:[,(|:\-–—][^\S\n]*|(?:is|was|serves[^\S\n]+as)[^\S\n]+)?[*_]{0,2}[^\S\n]*"
+    r"(?:(?:the|an?)[^\S\n]+)?(?:\S+['’]s[^\S\n]+)?"
+)
+_STAKEHOLDER_RE = _re_engine.compile(
+    rf"{_NAME_PATTERN}{_NAME_TITLE_SEPARATOR}{_TITLE_PATTERN}\b"
+    rf"|\b{_TITLE_PATTERN}[^\n.;]{{0,30}}?[^\S\n]{_NAME_PATTERN}"
+)
+# Any job title at all; findings without one clearly lack stakeholder mapping
+_TITLE_RE = _re_engine.compile(rf"\b{_TITLE_PATTERN}\b")
+
+# Bracketed template slots such as "[Org name]" in _PHASE_QUERIES
+_PLACEHOLDER_RE = re.compile(r"\s*\[[^\]]+\]")
+
+# Highest-confidence claims kept per source; the sources dict is rendered into the composer prompt
+_MAX_CLAIMS_PER_SOURCE = 32
+
+
+def _minify(text: str) -> str:
+    """Drops source indentation, trailing spaces and repeated blank lines from a prompt once at import."""
+    lines = (line.rstrip() for line in textwrap.dedent(text).strip().splitlines())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+# Query templates per research phase for sales_researcher. Kept as data and rendered
+# one line per phase, instead of the nested markdown lists the prompt used to spell out.
+_PHASE_QUERIES: Final[dict[str, tuple[str, ...]]] = {
+    "Phase 1 - Product Intelligence (per product)": (
+        "[Product name] competitors comparison features pricing",
+        "[Product category] market leaders 2024 analysis",
+        "[Product name] vs [known competitor] differences",
+        "[Product name] customer reviews G2 Capterra TrustRadius",
+        "[Product name] case studies ROI customer success",
+        "[Product name] pricing model cost benefits",
+        "[Product name] integration capabilities API technical",
+        "[Product category] buyer guide selection criteria",
+    ),
+    "Phase 2 - Organization Intelligence (per organization)": (
+        "[Org name] official website about leadership team",
+        "[Org name] revenue financial performance annual report",
+        "[Org name] recent news 2024 strategic initiatives",
+        "[Org name] company size employees headcount",
+        "[Org name] organizational chart executives departments",
+        "[Org name] CTO CIO IT leadership technology team",
+        "[Org name] procurement process vendor selection",
+        "[Org name] LinkedIn employees leadership profiles",
+    ),
+    "Phase 3 - Technology & Vendor Landscape (per organization)": (
+        "[Org name] technology stack tools software vendors",
+        "[Org name] [product category] current solutions",
+        "[Org name] vendor partnerships technology integrations",
+        "[Org name] digital transformation initiatives modernization",
+        "[Org name] vendor contracts renewals procurement announcements",
+        "[Org name] software implementations technology deployments",
+        "[Org name] vendor satisfaction reviews complaints",
+    ),
+    "Phase 4 - Stakeholder Research (per key person)": (
+        "[Person name] [Org name] LinkedIn background experience",
+        "[Department head] [Org name] technology priorities initiatives",
+        "[Org name] recent hires leadership changes [product category]",
+        "[Org name] conference speakers technology presentations",
+    ),
+    "Phase 5 - Competitive & Market Research (cross-analysis)": (
+        "[Competitor name] [Org name] partnership implementation",
+        "[Product category] market share [Org name] industry",
+        "[Org name] RFP requirements vendor selection [product category]",
+        "[Org name] budget technology spending [current year]",
+    ),
+}
+
+
+def _render_phase_queries() -> str:
+    """Renders the phase query templates as one compact line per phase."""
+    # Indented like the surrounding prompt body so _minify can still dedent it
+    return "\n    ".join(
+        f"- {phase}: " + "; ".join(f'"{query}"' for query in queries)
+        for phase, queries in _PHASE_QUERIES.items()
+    )
 
 
 # --- Structured Output Models ---
@@ -63,26 +171,119 @@ class SalesFeedback(BaseModel):
     )
 
 
+# Leading words that make a "name" match part of a job title instead ("Senior Product Manager")
+_TITLE_WORDS: Final = frozenset({
+    "Senior", "Junior", "Lead", "Principal", "Staff", "Associate", "Assistant", "Deputy", "Interim",
+    "Acting", "Former", "Executive", "Managing", "General", "Regional", "Global", "Group", "Country",
+    "Area", "Division", "Chief", "Vice", "Head", "Product", "Program", "Project", "Account", "Sales",
+    "Marketing", "Operations", "Finance", "Engineering", "Technology", "Technical", "Business",
+})
+
+
 # --- Callbacks (preserved from original) ---
+def _named_stakeholders(findings: str) -> List[str]:
+    """Returns the distinct person names mentioned alongside a job title, in order of appearance."""
+    names = (first or second for first, second in _STAKEHOLDER_RE.findall(findings))
+    return list(dict.fromkeys(name for name in names if name.split(" ", 1)[0] not in _TITLE_WORDS))
+
+
+def set_current_date_callback(callback_context: CallbackContext) -> None:
+    """Stores today's date for the `{current_date}` placeholder in the sales agents' instructions."""
+    # Resolved per request rather than at import, so a long-running server never goes stale
+    callback_context.state["current_date"] = datetime.date.today().isoformat()
+
+
+def _target_organization_names(state) -> List[str]:
+    """Target organization names from the upstream sales input or user analysis, whichever parses first."""
+    for key, field in (("sales_agent_input", "target_organizations"), ("user_analysis", "organizations_mentioned")):
+        value = state.get(key)
+        if isinstance(value, str):
+            # Model output, possibly wrapped in a ```json fence
+            text = value.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+            try:
+                value = json.loads(text)
+            except ValueError:
+                continue
+        if not isinstance(value, dict):
+            continue
+        names = [org.get("name") if isinstance(org, dict) else org for org in value.get(field) or []]
+        names = [name.strip() for name in names if isinstance(name, str) and name.strip()]
+        if names:
+            return list(dict.fromkeys(names))
+    return []
+
+
+def quick_grade_callback(callback_context: CallbackContext) -> Optional[genai_types.Content]:
+    """Extracts named stakeholders for the evaluator, failing research that mentions no job titles without a model call."""
+    findings = str(callback_context.state.get("sales_research_findings") or "")
+    names = _named_stakeholders(findings)
+    # The evaluator reads this list instead of counting names itself
+    callback_context.state["extracted_names_summary"] = (
+        f"{len(names)} named: {', '.join(names)}" if names else "none found"
+    )
+    if names or _TITLE_RE.search(findings):
+        # Titles without a recognized name may still be named stakeholders in a format the
+        # pattern misses; anything short of a clear failure needs the evaluator's judgement
+        return None
+
+    stakeholder_queries = (
+        *_PHASE_QUERIES["Phase 2 - Organization Intelligence (per organization)"][4:6],
+        _PHASE_QUERIES["Phase 4 - Stakeholder Research (per key person)"][2],
+    )
+    organizations = _target_organization_names(callback_context.state)
+    comment = "No decision-makers are identified by name; stakeholder mapping is missing."
+    if organizations:
+        # Fill the organization slot and drop the slots this hard-coded feedback cannot resolve
+        follow_up_queries = [
+            SalesResearchQuery(
+                search_query=_PLACEHOLDER_RE.sub("", query.replace("[Org name]", organization)).strip(),
+                research_phase="stakeholder_mapping",
+                target_entity=organization,
+            )
+            for organization in organizations
+            for query in stakeholder_queries
+        ]
+    else:
+        comment += " Replace each bracketed placeholder in the follow-up queries with the actual target organization or product category before searching."
+        follow_up_queries = [
+            SalesResearchQuery(
+                search_query=query,
+                research_phase="stakeholder_mapping",
+                target_entity="Each target organization",
+            )
+            for query in stakeholder_queries
+        ]
+    feedback = SalesFeedback(grade="fail", comment=comment, follow_up_queries=follow_up_queries)
+    callback_context.state["sales_research_evaluation"] = feedback.model_dump()
+    logging.info("[%s] No job titles in findings, failing without the critic model", callback_context.agent_name)
+    return genai_types.Content(role="model", parts=[genai_types.Part(text=feedback.model_dump_json())])
+
+
 def collect_research_sources_callback(callback_context: CallbackContext) -> None:
     """Collects and organizes web-based research sources and their supported claims from agent events."""
     session = callback_context._invocation_context.session
     url_to_short_id = callback_context.state.get("url_to_short_id", {})
     sources = callback_context.state.get("sources", {})
     id_counter = len(url_to_short_id) + 1
-    for event in session.events:
-        if not (event.grounding_metadata and event.grounding_metadata.grounding_chunks):
+    # Events before this index were handled by an earlier invocation; re-walking them
+    # would append their supported claims a second time
+    start = callback_context.state.get("sources_events_processed", 0)
+    events = session.events
+    # (text_segment, confidence) pairs already recorded per source, built lazily from
+    # state since sets are not JSON-serializable session state
+    seen_claims: Dict[str, set] = {}
+    for event in events[start:]:
+        metadata = event.grounding_metadata
+        if not (metadata and metadata.grounding_chunks):
             continue
         chunks_info = {}
-        for idx, chunk in enumerate(event.grounding_metadata.grounding_chunks):
-            if not chunk.web:
+        for idx, chunk in enumerate(metadata.grounding_chunks):
+            web = chunk.web
+            if not web:
                 continue
-            url = chunk.web.uri
-            title = (
-                chunk.web.title
-                if chunk.web.title != chunk.web.domain
-                else chunk.web.domain
-            )
+            url = web.uri
+            domain = web.domain
+            title = web.title
             if url not in url_to_short_id:
                 short_id = f"src-{id_counter}"
                 url_to_short_id[url] = short_id
@@ -90,30 +291,47 @@ def collect_research_sources_callback(callback_context: CallbackContext) -> None
                     "short_id": short_id,
                     "title": title,
                     "url": url,
-                    "domain": chunk.web.domain,
+                    "domain": domain,
                     "supported_claims": [],
                 }
                 id_counter += 1
             chunks_info[idx] = url_to_short_id[url]
-        if event.grounding_metadata.grounding_supports:
-            for support in event.grounding_metadata.grounding_supports:
+        if metadata.grounding_supports:
+            for support in metadata.grounding_supports:
                 confidence_scores = support.confidence_scores or []
                 chunk_indices = support.grounding_chunk_indices or []
+                segment = support.segment
+                text_segment = segment.text if segment else ""
                 for i, chunk_idx in enumerate(chunk_indices):
                     if chunk_idx in chunks_info:
                         short_id = chunks_info[chunk_idx]
                         confidence = (
                             confidence_scores[i] if i < len(confidence_scores) else 0.5
                         )
-                        text_segment = support.segment.text if support.segment else ""
-                        sources[short_id]["supported_claims"].append(
-                            {
-                                "text_segment": text_segment,
-                                "confidence": confidence,
+                        claims = sources[short_id]["supported_claims"]
+                        seen = seen_claims.get(short_id)
+                        if seen is None:
+                            seen = seen_claims[short_id] = {
+                                (claim["text_segment"], round(claim["confidence"], 3)) for claim in claims
                             }
-                        )
+                        key = (text_segment, round(confidence, 3))
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        claim = {
+                            "text_segment": text_segment,
+                            "confidence": confidence,
+                        }
+                        if len(claims) < _MAX_CLAIMS_PER_SOURCE:
+                            claims.append(claim)
+                            continue
+                        # Full: replace the weakest claim if this one is more confident
+                        weakest = min(range(len(claims)), key=lambda j: claims[j]["confidence"])
+                        if confidence > claims[weakest]["confidence"]:
+                            claims[weakest] = claim
     callback_context.state["url_to_short_id"] = url_to_short_id
     callback_context.state["sources"] = sources
+    callback_context.state["sources_events_processed"] = len(events)
 
 
 def citation_replacement_callback(
@@ -123,45 +341,60 @@ def citation_replacement_callback(
     final_report = callback_context.state.get("sales_intelligence_agent", "")
     sources = callback_context.state.get("sources", {})
 
+    if not sources:
+        # Nothing to link: drop stray tags with the spaces before them (never a line break,
+        # see _CITATION_RE), keep the punctuation fix and add a static footer
+        processed_report = _CITATION_RE.sub(lambda m: m.group(3) or "", final_report)
+        processed_report += "\n\n## References\n(No sources)\n"
+        callback_context.state["sales_intelligence_agent"] = processed_report
+        return genai_types.Content(parts=[genai_types.Part(text=processed_report)])
+
     # Assign each short_id a numeric index
-    short_id_to_index = {}
-    for idx, short_id in enumerate(sorted(sources.keys()), start=1):
-        short_id_to_index[short_id] = idx
+    sorted_short_ids = sorted(sources)
+    # Short ids are "src-N", so look the index up by N in a flat list (0 = unknown id)
+    index_by_n = [0] * (max((int(short_id[4:]) for short_id in sources), default=0) + 1)
+    for idx, short_id in enumerate(sorted_short_ids, start=1):
+        index_by_n[int(short_id[4:])] = idx
 
-    # Replace <cite> tags with clickable reference links
+    # Replace <cite> tags with clickable reference links and tidy punctuation
     def tag_replacer(match: re.Match) -> str:
-        short_id = match.group(1)
-        if short_id not in short_id_to_index:
-            logging.warning(f"Invalid citation tag found and removed: {match.group(0)}")
+        n = match.group(2)
+        if n is None:
+            return match.group(3)
+        n = int(n)
+        index = index_by_n[n] if n < len(index_by_n) else 0
+        if not index:
+            logging.warning("Invalid citation tag found and removed: %s", match.group(0).strip())
             return ""
-        index = short_id_to_index[short_id]
-        return f"[<a href=\"#ref{index}\">{index}</a>]"
+        return f"{match.group(1)}[<a href=\"#ref{index}\">{index}</a>]"
 
-    processed_report = re.sub(
-        r'<cite\s+source\s*=\s*["\']?\s*(src-\d+)\s*["\']?\s*/?>',
-        tag_replacer,
-        final_report,
-    )
-    processed_report = re.sub(r"\s+([.,;:])", r"\1", processed_report)
+    processed_report = _CITATION_RE.sub(tag_replacer, final_report)
 
     # Build a Wikipedia-style References section with anchors
-    references = "\n\n## References\n"
-    for short_id, idx in sorted(short_id_to_index.items(), key=lambda x: x[1]):
+    parts = [processed_report, "\n\n## References\n"]
+    # Indices are dense 1..N in sorted order, so no second sort is needed
+    for idx, short_id in enumerate(sorted_short_ids, start=1):
         source_info = sources[short_id]
         domain = source_info.get('domain', '')
-        references += (
+        parts.append(
             f"<p id=\"ref{idx}\">[{idx}] "
             f"<a href=\"{source_info['url']}\">{source_info['title']}</a>"
             f"{f' ({domain})' if domain else ''}</p>\n"
         )
 
-    processed_report += references
+    processed_report = "".join(parts)
 
     callback_context.state["sales_intelligence_agent"] = processed_report
     return genai_types.Content(parts=[genai_types.Part(text=processed_report)])
 
 
 # --- Custom Agent for Loop Control ---
+# Stop the QA loop early once this many consecutive rounds each add fewer than
+# _MIN_QA_GAIN named stakeholders and sources combined
+_QA_PLATEAU_ROUNDS = 2
+_MIN_QA_GAIN = 2
+
+
 class SalesEscalationChecker(BaseAgent):
     """Checks sales research evaluation and escalates to stop the loop if grade is 'pass'."""
 
@@ -171,25 +404,41 @@ class SalesEscalationChecker(BaseAgent):
     async def _run_async_impl(
         self, ctx: InvocationContext
     ) -> AsyncGenerator[Event, None]:
-        evaluation_result = ctx.session.state.get("sales_research_evaluation")
+        state = ctx.session.state
+        # Named stakeholders plus distinct sources, as a cheap measure of how much was found
+        coverage = len(_named_stakeholders(str(state.get("sales_research_findings") or ""))) + len(
+            state.get("sources", {})
+        )
+        previous = state.get("qa_history") or {}
+        # History from an earlier request in the same session must not count towards a plateau
+        earlier_rounds = previous.get("coverage", []) if previous.get("invocation_id") == ctx.invocation_id else []
+        qa_history = [*earlier_rounds, coverage][-(_QA_PLATEAU_ROUNDS + 1):]
+        plateaued = len(qa_history) > _QA_PLATEAU_ROUNDS and all(
+            later - earlier < _MIN_QA_GAIN for earlier, later in zip(qa_history, qa_history[1:])
+        )
+        state_delta = {"qa_history": {"invocation_id": ctx.invocation_id, "coverage": qa_history}}
+
+        evaluation_result = state.get("sales_research_evaluation")
         if evaluation_result and evaluation_result.get("grade") == "pass":
             logging.info(
-                f"[{self.name}] Sales intelligence research evaluation passed. Escalating to stop loop."
+                "[%s] Sales intelligence research evaluation passed. Escalating to stop loop.", self.name
+            )
+            yield Event(author=self.name, actions=EventActions(escalate=True, state_delta=state_delta))
+        elif plateaued:
+            logging.info(
+                "[%s] Research coverage plateaued at %s over the last rounds. Escalating to stop loop.",
+                self.name, qa_history,
             )
-            yield Event(author=self.name, actions=EventActions(escalate=True))
+            yield Event(author=self.name, actions=EventActions(escalate=True, state_delta=state_delta))
         else:
             logging.info(
-                f"[{self.name}] Sales research evaluation failed or not found. Loop will continue."
+                "[%s] Sales research evaluation failed or not found. Loop will continue.", self.name
             )
-            yield Event(author=self.name)
+            yield Event(author=self.name, actions=EventActions(state_delta=state_delta))
 
 
 # --- ENHANCED AGENT DEFINITIONS ---
-sales_plan_generator = LlmAgent(
-    model = config.search_model,
-    name="sales_plan_generator",
-    description="Generates comprehensive sales intelligence research plans for product-organization fit analysis.",
-    instruction=f"""
+_SALES_PLAN_GENERATOR_INSTRUCTION: Final[str] = _minify("""
     You are an expert sales intelligence strategist specializing in product-market fit analysis and account-based selling research.
     
     Your task is to create a systematic 5-phase research plan to investigate target organizations and products for optimal sales alignment, focusing on:
@@ -255,43 +504,30 @@ sales_plan_generator = LlmAgent(
     - **`[DELIVERABLE]`**: Generate stakeholder engagement strategy and action plan
 
     **SEARCH STRATEGY INTEGRATION:**
-    Your plan should guide the researcher to use these search patterns:
-    
-    Product Research:
-    - "[Product name]" + "competitors" + "comparison" + "vs"
-    - "[Product category]" + "market analysis" + "leaders" + "2024"
-    - "[Product name]" + "customer reviews" + "case studies" + "ROI"
-    - "[Product name]" + "pricing" + "features" + "integration"
-
-    Organization Research:
-    - "[Org name]" + "official website" + "leadership" + "executives"
-    - "[Org name]" + "financial" + "revenue" + "funding" + "budget"
-    - "[Org name]" + "technology stack" + "vendors" + "solutions"
-    - "[Org name]" + "news" + "2024" + "strategic initiatives"
-    - "[Org name]" + "org chart" + "departments" + "decision makers"
-
-    Competitive Analysis:
-    - "[Org name]" + "[Product category]" + "current solutions"
-    - "[Org name]" + "vendor contracts" + "renewals" + "procurement"
-    - "[Product competitors]" + "[Org name]" + "implementation" + "usage"
+    The researcher already runs a fixed set of query templates per phase. For each phase, name the concrete products, product categories, organizations, competitors and people to substitute into them, rather than writing the queries out.
 
     **TOOL USE:**
     Only use Google Search if product or organization information is ambiguous and needs verification.
     Do NOT conduct the actual research - that's for the researcher agent.
     
-    Current date: {datetime.datetime.now().strftime("%Y-%m-%d")}
+    Current date: {current_date}
     
     Focus on creating plans that will generate actionable sales intelligence for product-organization alignment and account-based selling strategies.
-    """,
+    """)
+
+sales_plan_generator = LlmAgent(
+    model = config.query_gen_model,
+    name="sales_plan_generator",
+    description="Generates comprehensive sales intelligence research plans for product-organization fit analysis.",
+    instruction=_SALES_PLAN_GENERATOR_INSTRUCTION,
     output_key="sales_research_plan",
     tools=[google_search],
+    # Cache hits return before the throttle, so only real searches are paced
+    before_model_callback=[search_cache_lookup_callback, throttle_search_requests],
+    after_model_callback=search_cache_store_callback,
 )
 
-sales_section_planner = LlmAgent(
-    model = config.worker_model,
-    name="sales_section_planner",
-    description="Creates a structured sales intelligence report outline following the standardized 9-section format.",
-    instruction="""
+_SALES_SECTION_PLANNER_INSTRUCTION: Final[str] = _minify("""
     You are an expert sales intelligence report architect. Using the sales research plan, create a structured markdown outline that follows the standardized Sales Intelligence Report Format.
 
     Your outline must include these core sections:
@@ -376,18 +612,17 @@ sales_section_planner = LlmAgent(
 
     Ensure your outline allows for modular expansion - additional products or organizations can be added without breaking the structure.
     Do not include a separate References section - citations will be inline throughout.
-    """,
+    """)
+
+sales_section_planner = LlmAgent(
+    model = config.worker_model,
+    name="sales_section_planner",
+    description="Creates a structured sales intelligence report outline following the standardized 9-section format.",
+    instruction=_SALES_SECTION_PLANNER_INSTRUCTION,
     output_key="sales_report_sections",
 )
 
-sales_researcher = LlmAgent(
-    model = config.search_model,
-    name="sales_researcher",
-    description="Specialized sales intelligence researcher focusing on product-organization fit analysis and competitive positioning.",
-    planner=BuiltInPlanner(
-        thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
-    ),
-    instruction="""
+_SALES_RESEARCHER_INSTRUCTION: Final[str] = _minify(f"""
     You are a specialized sales intelligence researcher with expertise in product-market fit analysis, competitive intelligence, and account-based selling research.
 
     **CORE RESEARCH PRINCIPLES:**
@@ -398,68 +633,8 @@ sales_researcher = LlmAgent(
     - Risk Assessment: Flag potential obstacles, competitive threats, and misalignment factors
 
     **EXECUTION METHODOLOGY:**
-
-    **Phase 1: Product Intelligence Research**
-    For each product mentioned in the research plan:
-
-    *Market Positioning & Competition:*
-    - "[Product name] competitors comparison features pricing"
-    - "[Product category] market leaders 2024 analysis"
-    - "[Product name] vs [known competitor] differences"
-    - "[Product name] customer reviews G2 Capterra TrustRadius"
-
-    *Value Proposition & Use Cases:*
-    - "[Product name] case studies ROI customer success"
-    - "[Product name] pricing model cost benefits"
-    - "[Product name] integration capabilities API technical"
-    - "[Product category] buyer guide selection criteria"
-
-    **Phase 2: Organization Intelligence Research**
-    For each target organization:
-
-    *Company Fundamentals:*
-    - "[Org name] official website about leadership team"
-    - "[Org name] revenue financial performance annual report"
-    - "[Org name] recent news 2024 strategic initiatives"
-    - "[Org name] company size employees headcount"
-
-    *Decision-Making Structure:*
-    - "[Org name] organizational chart executives departments"
-    - "[Org name] CTO CIO IT leadership technology team"
-    - "[Org name] procurement process vendor selection"
-    - "[Org name] LinkedIn employees leadership profiles"
-
-    **Phase 3: Technology & Vendor Landscape**
-    For each target organization:
-
-    *Current Technology Stack:*
-    - "[Org name] technology stack tools software vendors"
-    - "[Org name] [product category] current solutions"
-    - "[Org name] vendor partnerships technology integrations"
-    - "[Org name] digital transformation initiatives modernization"
-
-    *Vendor Relationships:*
-    - "[Org name] vendor contracts renewals procurement announcements"
-    - "[Org name] software implementations technology deployments"
-    - "[Org name] vendor satisfaction reviews complaints"
-
-    **Phase 4: Stakeholder Research**
-    For key personnel at each organization:
-
-    *Decision-Maker Analysis:*
-    - "[Person name] [Org name] LinkedIn background experience"
-    - "[Department head] [Org name] technology priorities initiatives"
-    - "[Org name] recent hires leadership changes [product category]"
-    - "[Org name] conference speakers technology presentations"
-
-    **Phase 5: Competitive & Market Research**
-    Cross-analysis research:
-
-    *Competitive Positioning:*
-    - "[Competitor name] [Org name] partnership implementation"
-    - "[Product category] market share [Org name] industry"
-    - "[Org name] RFP requirements vendor selection [product category]"
-    - "[Org name] budget technology spending [current year]"
+    Run these query templates, substituting the products, organizations, competitors and people from the research plan:
+    {_render_phase_queries()}
 
     **QUALITY STANDARDS:**
     - Source Diversity: Mix official sources, industry reports, social media, and third-party reviews
@@ -486,17 +661,25 @@ sales_researcher = LlmAgent(
     - Flag information gaps requiring additional research
 
     Your research must provide actionable intelligence for account-based selling and product positioning strategies.
-    """,
+    """)
+
+sales_researcher = LlmAgent(
+    model = config.search_model,
+    name="sales_researcher",
+    description="Specialized sales intelligence researcher focusing on product-organization fit analysis and competitive positioning.",
+    planner=BuiltInPlanner(
+        thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
+    ),
+    instruction=_SALES_RESEARCHER_INSTRUCTION,
     tools=[google_search],
+    # Cache hits return before the throttle, so only real searches are paced
+    before_model_callback=[search_cache_lookup_callback, throttle_search_requests],
+    after_model_callback=search_cache_store_callback,
     output_key="sales_research_findings",
     after_agent_callback=collect_research_sources_callback,
 )
 
-sales_evaluator = LlmAgent(
-    model = config.critic_model,
-    name="sales_evaluator",
-    description="Evaluates sales intelligence research completeness and identifies gaps for product-organization fit analysis.",
-    instruction=f"""
+_SALES_EVALUATOR_INSTRUCTION: Final[str] = _minify("""
     You are a senior sales intelligence analyst evaluating research for completeness and sales actionability.
 
     **EVALUATION CRITERIA:**
@@ -521,6 +704,8 @@ sales_evaluator = LlmAgent(
     - Technology gaps and modernization initiatives
 
     **4. Stakeholder Mapping Quality (20%):**
+    Named stakeholders pattern-matched from the findings (a hint, not a verdict): {extracted_names_summary}
+    Check this list against the findings: it can miss names in unusual formats and include non-names. Then judge whether the stakeholders are the right decision-makers and how complete their profiles are.
     - Decision-maker identification with contact details
     - Influence mapping and champion identification potential
     - Individual backgrounds, interests, and technology preferences
@@ -558,23 +743,23 @@ sales_evaluator = LlmAgent(
 
     Be demanding about research quality - sales intelligence requires detailed, current, and actionable information for successful account-based selling.
 
-    Current date: {datetime.datetime.now().strftime("%Y-%m-%d")}
+    Current date: {current_date}
     Your response must be a single, raw JSON object validating against the 'SalesFeedback' schema.
-    """,
+    """)
+
+sales_evaluator = LlmAgent(
+    model = config.critic_model,
+    name="sales_evaluator",
+    description="Evaluates sales intelligence research completeness and identifies gaps for product-organization fit analysis.",
+    instruction=_SALES_EVALUATOR_INSTRUCTION,
     output_schema=SalesFeedback,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
     output_key="sales_research_evaluation",
+    before_agent_callback=quick_grade_callback,
 )
 
-enhanced_sales_search = LlmAgent(
-    model = config.search_model,
-    name="enhanced_sales_search",
-    description="Executes targeted follow-up searches to fill sales intelligence gaps identified by the evaluator.",
-    planner=BuiltInPlanner(
-        thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
-    ),
-    instruction="""
+_ENHANCED_SALES_SEARCH_INSTRUCTION: Final[str] = _minify("""
     You are a specialist sales intelligence researcher executing precision follow-up research to address specific gaps in product-organization fit analysis.
 
     **MISSION:**
@@ -587,7 +772,7 @@ enhanced_sales_search = LlmAgent(
        - Product-organization fit assessment depth
        - Sales actionability and next steps clarity
 
-    2. **Execute Targeted Searches:** Run EVERY query in 'follow_up_queries' using these enhanced search techniques:
+    2. **Execute Targeted Searches:** Run EVERY query in 'follow_up_queries' together in a single batched search step (not one search turn per query), using these enhanced search techniques:
        - Use exact product names and competitor names for precision
        - Include organization names with specific role titles for stakeholder identification
        - Target specific platforms (LinkedIn for personnel, G2/Capterra for product reviews)
@@ -617,29 +802,30 @@ enhanced_sales_search = LlmAgent(
     - Ensure enhanced research supports account-based selling strategies
 
     Your output must be complete, enhanced sales intelligence findings that address all identified gaps and enable immediate sales action.
-    """,
+    """)
+
+enhanced_sales_search = LlmAgent(
+    model = config.search_model,
+    name="enhanced_sales_search",
+    description="Executes targeted follow-up searches to fill sales intelligence gaps identified by the evaluator.",
+    planner=BuiltInPlanner(
+        thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
+    ),
+    instruction=_ENHANCED_SALES_SEARCH_INSTRUCTION,
     tools=[google_search],
+    # Cache hits return before the throttle, so only real searches are paced
+    before_model_callback=[search_cache_lookup_callback, throttle_search_requests],
+    after_model_callback=search_cache_store_callback,
     output_key="sales_research_findings",
     after_agent_callback=collect_research_sources_callback,
 )
 
-sales_report_composer = LlmAgent(
-    model = config.critic_model,
-    name="sales_report_composer",
-    include_contents="none",
-    description="Composes comprehensive sales intelligence reports following the standardized 9-section format with proper citations.",
-    instruction="""
+# Static standards first and inputs last, so every run shares one long cacheable prompt prefix
+_COMPOSER_STATIC_PREFIX: Final[str] = _minify("""
     You are an expert sales intelligence report writer specializing in product-organization fit analysis and account-based selling strategy.
 
     **MISSION:** Transform research data into a polished, professional Sales Intelligence Report following the exact standardized 9-section format.
 
-    ---
-    ### INPUT DATA SOURCES
-    * Research Plan: `{sales_research_plan}`
-    * Research Findings: `{sales_research_findings}` 
-    * Citation Sources: `{sources}`
-    * Report Structure: `{sales_report_sections}`
-
     ---
     ### REPORT COMPOSITION STANDARDS
 
@@ -699,7 +885,54 @@ sales_report_composer = LlmAgent(
     - Ensure professional tone suitable for sales team execution
 
     Generate a comprehensive sales intelligence report that enables immediate account-based selling execution.
-    """,
+""")
+
+_COMPOSER_INPUTS: Final[str] = """
+
+### INPUT DATA SOURCES
+* Research Plan: `{sales_research_plan}`
+* Research Findings: `{sales_research_findings}`
+* Citation Sources (id: title (domain) | supported claims): `{sources}`
+* Report Structure: `{sales_report_sections}`
+"""
+
+
+def _compact_sources(sources: dict) -> str:
+    """Lists each source with only what citing needs; URLs and scores are added back by the references."""
+    return "\n".join(
+        f"{short_id}: {info['title']} ({info.get('domain', '')}) | "
+        + "; ".join(claim["text_segment"] for claim in info["supported_claims"])
+        for short_id, info in sources.items()
+    )
+
+
+def _dedupe_paragraphs(findings: str) -> str:
+    """Drops findings paragraphs that repeat an earlier one up to whitespace and case."""
+    # Gap-fill rounds rewrite the findings by merging old and new, which repeats whole paragraphs
+    paragraphs: Dict[str, str] = {}
+    for paragraph in re.split(r"\n\s*\n", findings):
+        if paragraph.strip():
+            paragraphs.setdefault(" ".join(paragraph.split()).casefold(), paragraph)
+    return "\n\n".join(paragraphs.values())
+
+
+def _composer_instruction(ctx: ReadonlyContext) -> str:
+    """Formats only the input tail onto the static composer prompt."""
+    state = ctx.state
+    return _COMPOSER_STATIC_PREFIX + _COMPOSER_INPUTS.format(
+        sales_research_plan=state.get("sales_research_plan", ""),
+        sales_research_findings=_dedupe_paragraphs(str(state.get("sales_research_findings", ""))),
+        sources=_compact_sources(state.get("sources", {})),
+        sales_report_sections=state.get("sales_report_sections", ""),
+    )
+
+
+sales_report_composer = LlmAgent(
+    model = config.composer_model,
+    name="sales_report_composer",
+    include_contents="none",
+    description="Composes comprehensive sales intelligence reports following the standardized 9-section format with proper citations.",
+    instruction=_composer_instruction,
     output_key="sales_intelligence_agent",
     after_agent_callback=citation_replacement_callback,
 )
@@ -708,9 +941,13 @@ sales_report_composer = LlmAgent(
 sales_intelligence_pipeline = SequentialAgent(
     name="sales_intelligence_pipeline",
     description="Executes comprehensive sales intelligence research following the 5-phase methodology for product-organization fit analysis.",
+    before_agent_callback=set_current_date_callback,
     sub_agents=[
-        sales_section_planner,
-        sales_researcher,
+        # The report outline and the research are independent; run them concurrently
+        ParallelAgent(
+            name="plan_and_research",
+            sub_agents=[sales_section_planner, sales_researcher],
+        ),
         LoopAgent(
             name="sales_quality_assurance_loop",
             max_iterations=config.max_search_iterations,
@@ -725,11 +962,7 @@ sales_intelligence_pipeline = SequentialAgent(
 )
 
 # --- UPDATED MAIN AGENT ---
-sales_intelligence_agent = LlmAgent(
-    name="sales_intelligence_agent",
-    model = config.worker_model,
-    description="Specialized sales intelligence assistant that creates comprehensive product-organization fit analysis reports for account-based selling.",
-    instruction=f"""
+_SALES_INTELLIGENCE_AGENT_INSTRUCTION: Final[str] = _minify("""
     You are a specialized Sales Intelligence Assistant focused on comprehensive product-organization fit analysis for account-based selling and strategic sales planning.
 
     **CORE MISSION:**
@@ -790,13 +1023,21 @@ sales_intelligence_agent = LlmAgent(
     **AUTOMATIC EXECUTION:**
     You will proceed immediately with research without asking for approval or clarification unless the input is completely ambiguous. Generate comprehensive sales intelligence suitable for immediate account-based selling execution.
 
-    Current date: {datetime.datetime.now().strftime("%Y-%m-%d")}
+    Current date: {current_date}
 
     Remember: Plan → Execute → Deliver. Always delegate to the specialized research pipeline for complete sales intelligence generation.
-    """,
+    """)
+
+sales_intelligence_agent = LlmAgent(
+    name="sales_intelligence_agent",
+    model = config.worker_model,
+    description="Specialized sales intelligence assistant that creates comprehensive product-organization fit analysis reports for account-based selling.",
+    instruction=_SALES_INTELLIGENCE_AGENT_INSTRUCTION,
     sub_agents=[sales_intelligence_pipeline],
     tools=[AgentTool(sales_plan_generator)],
     output_key="sales_research_plan",
+    # The plan generator's AgentTool session inherits this state, date included
+    before_agent_callback=set_current_date_callback,
 )
 
 # root_agent = sales_intelligence_agent
\ No newline at end of file
@@ -0,0 +1,46 @@
+import logging
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from ..config import config
+from .response_cache import TTLCache, cache_key
+
+# Grounded responses (content plus grounding metadata) keyed by their normalized request
+_search_cache = TTLCache(ttl_seconds=config.search_ttl_hours * 3600, maxsize=256)
+
+
+def _request_key(llm_request: LlmRequest) -> str:
+    """Keys a model request on its model, system instruction and the text of its contents."""
+    parts = [llm_request.model or ""]
+    if llm_request.config and llm_request.config.system_instruction:
+        parts.append(str(llm_request.config.system_instruction))
+    for content in llm_request.contents:
+        parts.extend(part.text for part in content.parts or [] if part.text)
+    return cache_key(*parts)
+
+
+def search_cache_lookup_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Replays a cached grounded response for a repeated search request instead of calling the model."""
+    key = _request_key(llm_request)
+    cached = _search_cache.get(key)
+    if cached is None:
+        # Remembered for the matching after_model callback; temp: keys are never persisted
+        callback_context.state[f"temp:search_cache_key:{callback_context.agent_name}"] = key
+        return None
+    logging.info("[%s] Search cache hit, skipping grounded request", callback_context.agent_name)
+    # Grounding metadata is replayed too, so source collection sees the original citations
+    return cached.model_copy(deep=True)
+
+
+def search_cache_store_callback(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """Caches a completed grounded response under the key of the request that produced it."""
+    key = callback_context.state.get(f"temp:search_cache_key:{callback_context.agent_name}")
+    if key and not llm_response.partial and not llm_response.error_code and llm_response.content:
+        _search_cache.set(key, llm_response.model_copy(deep=True))
+    return None
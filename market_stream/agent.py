@@ -5,6 +5,7 @@ from google.genai import types as genai_types
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.tools.agent_tool import AgentTool
 from .tools.mongoupload import update_project_report, create_blank_project, announce_markdown_finish, announce_html_finish
+from .tools.usage_tracker import log_cache_report
 from .sub_agents.segmentation import segmentation_intelligence_agent
 from .sub_agents.target_org_research import organizational_research_pipeline, organizational_plan_generator
 from .sub_agents.prospect_research import prospect_researcher
@@ -38,6 +39,8 @@ def store_segmentation_report(callback_context: CallbackContext):
 
 def store_target_report(callback_context: CallbackContext):
     """Store Target intelligence report after sales_intelligence_agent completes"""
+    # The target pipeline has finished; report how much of its prompts the context cache served
+    log_cache_report()
     try:
         project_id = callback_context.state.get('project_id')
         project_id = project_id.replace('"','')
@@ -427,18 +430,10 @@ context_html_copmposer = LlmAgent(
     after_agent_callback = [store_context_report]
 )
 
-from .sub_agents.target_org_research.target_template import TARGET_TEMPLATE
+from .sub_agents.target_org_research import target_html_composer
 
-
-
-target_html_composer = LlmAgent(
-    model=config.critic_model,
-    name="html_report_generator",
-    description="Converts markdown sales intelligence reports into professional HTML format with responsive design and interactive elements.",
-    instruction=TARGET_TEMPLATE,
-    output_key="target_html",
-    after_agent_callback = [store_target_report]
-)
+# The model only extracts field values; the HTML itself is rendered locally
+target_html_composer.after_agent_callback = [store_target_report]
 
 whether_to_compose = LlmAgent(
     model=config.critic_model,
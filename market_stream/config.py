@@ -27,6 +27,10 @@ class ResearchConfiguration:
         critic_model (str): Model for evaluation tasks.
         worker_model (str): Model for working/generation tasks.
         max_search_iterations (int): Maximum search iterations allowed.
+        search_min_interval_ms (int): Steady-state spacing between grounded search requests.
+        search_burst (int): Grounded search requests allowed back to back before pacing starts.
+        include_thoughts (bool): Return model thoughts from planner-enabled agents (debugging only).
+        thinking_budget (int): Thinking token budget for planner-enabled agents.
     """
 
     # critic_model: str = "gemini-2.5-flash"
@@ -41,6 +45,10 @@ class ResearchConfiguration:
             )
         )
     max_search_iterations: int = 1
+    search_min_interval_ms: int = 500
+    search_burst: int = 5
+    include_thoughts: bool = os.getenv("INCLUDE_THOUGHTS", "false").lower() == "true"
+    thinking_budget: int = 2048
 
 
 config = ResearchConfiguration()
\ No newline at end of file
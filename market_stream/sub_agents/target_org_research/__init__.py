@@ -1 +1,2 @@
-from .target_research import organizational_research_pipeline, organizational_plan_generator
\ No newline at end of file
+from .target_research import organizational_research_pipeline, organizational_plan_generator
+from .target_html import target_html_composer
@@ -0,0 +1,67 @@
+from collections.abc import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types as genai_types
+from pydantic import create_model
+
+from ...config import config
+from .target_research import numbered_references, report_claim_texts, report_sources
+from .target_template import TARGET_FIELDS, TARGET_FIELDS_INSTRUCTION, TARGET_LIST_FIELDS, render_target_html
+
+
+def _list_field_type(name: str, columns: tuple[str, ...]) -> type:
+    """Row type for a repeated template block: plain strings, or one small model per row."""
+    if not columns:
+        return list[str]
+    row = create_model(f"{name.title().replace('_', '')}Row", **{column: (str, ...) for column in columns})
+    return list[row]
+
+
+# One required string per template placeholder, plus one array per repeated block.
+TargetHtmlFields = create_model(
+    "TargetHtmlFields",
+    **{name: (str, ...) for name in TARGET_FIELDS},
+    **{name: (_list_field_type(name, columns), ...) for name, columns in TARGET_LIST_FIELDS.items()},
+)
+
+
+target_html_field_extractor = LlmAgent(
+    model=config.critic_model,
+    name="target_html_field_extractor",
+    include_contents="none",
+    description="Extracts the field values of the target organization HTML report from the markdown report.",
+    instruction=TARGET_FIELDS_INSTRUCTION,
+    output_schema=TargetHtmlFields,
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+    output_key="target_html_fields",
+)
+
+
+class TargetHtmlRenderer(BaseAgent):
+    """Renders the target organization HTML report locally from the extracted fields."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        html = render_target_html(
+            fields=state.get("target_html_fields") or {},
+            references=numbered_references(report_sources(state), report_claim_texts(state)),
+            project_id=str(state.get("project_id", "")).replace('"', ''),
+        )
+        yield Event(
+            author=self.name,
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text=html)]),
+            actions=EventActions(state_delta={"target_html": html}),
+        )
+
+
+target_html_composer = SequentialAgent(
+    name="target_html_composer",
+    description="Converts the markdown target organization report into the professional HTML report.",
+    sub_agents=[
+        target_html_field_extractor,
+        TargetHtmlRenderer(name="target_html_renderer"),
+    ],
+)
@@ -1,144 +1,170 @@
+import logging
 import os
-from pymongo import MongoClient
-import requests,json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import IndexModel, MongoClient
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.adk.agents.callback_context import CallbackContext
 
+_STATUS_URL = "https://stu.globalknowledgetech.com:8444/project/project-status-update/{}/"
+_STATUS_TIMEOUT = 5
+
+# Keep-alive session so repeated status updates reuse the TLS connection to the status server.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.1)))
+
+# A single worker keeps status updates in the order they were announced ("updated" before "Completed").
+_announce_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="status-announce")
+
+def _send_status(project_id: str, payload: dict):
+    """PUTs one status update; runs on the announce pool so callers never wait on the status server."""
+    try:
+        _session.put(_STATUS_URL.format(project_id), json=payload, timeout=_STATUS_TIMEOUT)
+    except Exception as e:
+        logging.error("Error sending status update %s for project %s: %s", payload, project_id, e)
+
+try:
+    # zstandard lets pymongo negotiate zstd wire compression, which beats zlib on the large report bodies
+    import zstandard  # noqa: F401
+    _COMPRESSORS = "zstd,zlib"
+except ImportError:
+    _COMPRESSORS = "zlib"
+
+_PROJECT_INDEXES = [
+    # Every read and write filters on project_id; the unique index also makes the create upsert race-free.
+    IndexModel("project_id", unique=True),
+]
+
+def _ensure_indexes(collection: Collection):
+    """Creates the project indexes once per process; a failure is logged rather than blocking report writes."""
+    try:
+        collection.create_indexes(_PROJECT_INDEXES)
+    except PyMongoError as e:
+        logging.error("Could not ensure project indexes: %s", e)
+
+_client = None
+_client_lock = threading.Lock()
+
+def _get_collection() -> Collection:
+    """Returns the projects collection from one process-wide MongoClient, connecting on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                mongo_uri = os.getenv("MONGO_DB_CONNECTOR")
+                if not mongo_uri:
+                    raise ValueError("MONGO_DB_CONNECTOR environment variable is not set.")
+                client = MongoClient(mongo_uri, maxPoolSize=50, compressors=_COMPRESSORS)
+                _ensure_indexes(client["sales_reports"]["projects"])
+                _client = client
+    return _client["sales_reports"]["projects"]
+
 def announce_markdown_upload(project_id: str, report_type: str):
     """Store prospect research report after prospect_researcher completes"""
     try:
         project_id = project_id.replace('"','')
-
-        library = {
-        "market_context": "market_intelligence_agent",
-        "market_segment": "segmentation_intelligence_agent",
-        "target_org_research": "sales_intelligence_agent",
-        "prospect_research": "prospect_researcher"
-        }
-        requests.put(f"https://stu.globalknowledgetech.com:8444/project/project-status-update/{project_id}/",headers = {'Content-Type': 'application/json'}, data = json.dumps({"sub_status": f"{report_type} updated"}))
-        
-        
-        print("###################################################################################")
-        print("###################################################################################")
-        print(f"{report_type} report stored successfully for project {project_id}")
-        print(f'@sub_status {report_type} updated for project {project_id}')
-        print("###################################################################################")
-        print("###################################################################################")
-        
+        _announce_pool.submit(_send_status, project_id, {"sub_status": f"{report_type} updated"})
+        logging.info("%s report stored; @sub_status %s updated for project %s", report_type, report_type, project_id)
     except Exception as e:
-        print(f"Error announcing markdown report storage: {e}")
-        
+        logging.error("Error announcing markdown report storage: %s", e)
 
 def announce_markdown_finish(callback_context:CallbackContext):
     project_id = callback_context.state["project_id"]
     try:
         project_id = project_id.replace('"','')
-        requests.put(f"https://stu.globalknowledgetech.com:8444/project/project-status-update/{project_id}/",headers = {'Content-Type': 'application/json'}, data = json.dumps({"sub_status": f"Completed"}))
-        print('@{"sub_status": f"Completed"}')
+        _announce_pool.submit(_send_status, project_id, {"sub_status": "Completed"})
+        logging.info("@sub_status Completed for project %s", project_id)
     except Exception as e:
-        print(f"Error announcing markdown completion: {e}")
+        logging.error("Error announcing markdown completion: %s", e)
 
 def announce_html_upload(project_id: str, report_type: str):
     """Store prospect research report after prospect_researcher completes"""
     try:
         project_id = project_id.replace('"','')
-
-        library = {
-        "market_context": "context_html",
-        "market_segment": "seg_html",
-        "target_org_research": "target_html"
-        }
-        
-        requests.put(f"https://stu.globalknowledgetech.com:8444/project/project-status-update/{project_id}/",headers = {'Content-Type': 'application/json'}, data = json.dumps({"agent_status": f"{report_type} updated"}))
-
-        print("###################################################################################")
-        print("###################################################################################")
-        print(f"{report_type} report stored successfully for project {project_id}")
-        print(f'@agent_status {report_type} updated for project {project_id}')
-        print("###################################################################################")
-        print("###################################################################################")
-        
+        _announce_pool.submit(_send_status, project_id, {"agent_status": f"{report_type} updated"})
+        logging.info("%s report stored; @agent_status %s updated for project %s", report_type, report_type, project_id)
     except Exception as e:
-        print(f"Error storing prospect research report: {e}")
+        logging.error("Error announcing HTML report storage: %s", e)
 
 def announce_html_finish(callback_context:CallbackContext):
     project_id = callback_context.state["project_id"]
     try:
         project_id = project_id.replace('"','')
-        requests.put(f"https://stu.globalknowledgetech.com:8444/project/project-status-update/{project_id}/",headers = {'Content-Type': 'application/json'}, data = json.dumps({"agent_status": f"Completed"}))
-        print({"agent_status": f"Completed"})
+        _announce_pool.submit(_send_status, project_id, {"agent_status": "Completed"})
+        logging.info("@agent_status Completed for project %s", project_id)
     except Exception as e:
-        print(f"Error announcing markdown completion: {e}")
+        logging.error("Error announcing HTML completion: %s", e)
+
+_BLANK_PROJECT = {
+    "client_org_research": "",
+    "prospect_research": "",
+    "market_segment": "",
+    "target_org_research": "",
+    "client_org_research_html": "",
+    "market_context_html": "",
+    "prospect_research_html": "",
+    "market_segment_html": "",
+    "target_org_research_html": ""
+}
 
 def create_blank_project(project_id: str):
-    from pymongo import MongoClient
-    connection_string = os.getenv("MONGO_DB_CONNECTOR")
-    client = MongoClient(connection_string)
-    db = client["sales_reports"]
-    collection = db["projects"]
-
-    # Check if a document with the same project_id exists
-    existing_doc = collection.find_one({"project_id": project_id})
-    
-    if existing_doc:
-        print(f"Document with project_id '{project_id}' already exists.")
+    collection = _get_collection()
+
+    # Insert the blank document only if no document with this project_id exists, in one round-trip
+    result = collection.update_one(
+        {"project_id": project_id},
+        {"$setOnInsert": _BLANK_PROJECT},
+        upsert=True
+    )
+
+    if result.upserted_id is None:
+        logging.info("Document with project_id '%s' already exists.", project_id)
         return True  # No document is created, but returning False would cause pointless tool reruns 
 
-    # If not found, insert the blank document
-    document = {
-        "project_id": project_id,
-        "client_org_research": "",
-        "prospect_research": "",
-        "market_segment": "",
-        "target_org_research": "",
-        "client_org_research_html": "",
-        "market_context_html": "",
-        "prospect_research_html": "",
-        "market_segment_html": "",
-        "target_org_research_html": ""
-    }
-
-    collection.insert_one(document)
-    print(f"New document created for project_id '{project_id}'.")
+    logging.info("New document created for project_id '%s'.", project_id)
     return True 
 
+_ALLOWED_FIELDS = frozenset({
+    "client_org_research",
+    "market_context",
+    "prospect_research",
+    "market_segment",
+    "target_org_research",
+    "client_org_research_html",
+    "market_context_html",
+    "prospect_research_html",
+    "market_segment_html",
+    "target_org_research_html"
+})
+_HTML_FIELD = {report_type: f"{report_type}_html" for report_type in _ALLOWED_FIELDS}
+
 def update_project_report(project_id: str, report: str, report_type: str, html_report: str = ""):
     """
     Updates the report field (report_type) in the project document with the given project_id.
     """
-    allowed_fields = {
-        "client_org_research",
-        "market_context",
-        "prospect_research",
-        "market_segment",
-        "target_org_research",
-        "client_org_research_html",
-        "market_context_html",
-        "prospect_research_html",   
-        "market_segment_html",
-        "target_org_research_html"
-    }
-
-    if report_type not in allowed_fields:
-        raise ValueError(f"Invalid report_type. Must be one of: {', '.join(allowed_fields)}")
-
-    mongo_uri = os.getenv("MONGO_DB_CONNECTOR")
-    if not mongo_uri:
-        raise ValueError("MONGO_DB_CONNECTOR environment variable is not set.")
-
-    client = MongoClient(mongo_uri)
-    db = client["sales_reports"]
-    collection = db["projects"]
+    if report_type not in _ALLOWED_FIELDS:
+        raise ValueError(f"Invalid report_type. Must be one of: {', '.join(sorted(_ALLOWED_FIELDS))}")
+
+    collection = _get_collection()
+
+    # Markdown-stage calls carry no HTML yet; leave any stored HTML untouched instead of blanking it
+    fields = {report_type: report}
+    if html_report:
+        fields[_HTML_FIELD[report_type]] = html_report
 
     result = collection.update_one(
         {"project_id": project_id},
-        {"$set": {report_type: report, f"{report_type}_html":html_report}}
+        {"$set": fields}
     )
 
-    client.close()
-    if html_report != None or html_report != "":
-        announce_markdown_upload(project_id,report_type)
-    else:
+    if html_report:
         announce_html_upload(project_id,report_type)
+    else:
+        announce_markdown_upload(project_id,report_type)
 
     if result.matched_count == 0:
         raise ValueError(f"No project found with project_id '{project_id}'")
\ No newline at end of file
@@ -0,0 +1,89 @@
+import hashlib
+import logging
+import time
+from typing import Optional
+
+from google import genai
+from google.genai import errors as genai_errors
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types as genai_types
+
+# Gemini context caches live server-side for CACHE_TTL_SECONDS; refresh a bit early.
+CACHE_TTL_SECONDS = 300
+_REFRESH_MARGIN_SECONDS = 30
+
+_client: Optional[genai.Client] = None
+_cache_names: dict[str, tuple[str, float]] = {}  # prefix hash -> (cache name, expiry)
+_rejected: set[str] = set()  # prefix hashes the backend refused to cache
+# Definite refusals (prefix below the minimum token count, model without caching);
+# rate limits, server errors and timeouts are transient and retried on the next request
+_REJECTION_CODES = frozenset({400, 404})
+
+
+def _get_client() -> genai.Client:
+    global _client
+    if _client is None:
+        _client = genai.Client()
+    return _client
+
+
+def _prefix_key(model: str, config: genai_types.GenerateContentConfig) -> str:
+    """Hash the static request prefix (model, system instruction, tools)."""
+    instruction = config.system_instruction
+    if isinstance(instruction, genai_types.Content):
+        instruction = "".join(part.text or "" for part in instruction.parts or [])
+    tools = [tool.model_dump_json(exclude_none=True) for tool in config.tools or []]
+    payload = "\x00".join([model, str(instruction or ""), *tools])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def use_context_cache(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Serves the static instruction prefix of Gemini agents from a context cache.
+
+    The system instruction and tools are uploaded once via `caches.create` and
+    every later request only references the cache by name. Non-Gemini models,
+    and prefixes the backend refuses to cache (e.g. below the minimum token
+    count), are sent inline as before.
+    """
+    config = llm_request.config
+    model = llm_request.model or ""
+    if not model.startswith("gemini") or config is None or not config.system_instruction:
+        return None
+
+    key = _prefix_key(model, config)
+    if key in _rejected:
+        return None
+
+    cached = _cache_names.get(key)
+    if cached is None or cached[1] <= time.monotonic():
+        try:
+            cache = await _get_client().aio.caches.create(
+                model=model,
+                config=genai_types.CreateCachedContentConfig(
+                    display_name=callback_context.agent_name,
+                    system_instruction=config.system_instruction,
+                    tools=config.tools,
+                    ttl=f"{CACHE_TTL_SECONDS}s",
+                ),
+            )
+        except Exception as e:
+            logging.warning("[%s] Context caching unavailable, sending instruction inline: %s", callback_context.agent_name, e)
+            if isinstance(e, genai_errors.ClientError) and e.code in _REJECTION_CODES:
+                _rejected.add(key)
+            return None
+        now = time.monotonic()
+        # Expired entries point at caches the server has already dropped; evict them so the map stays bounded
+        for stale in [k for k, (_, expiry) in _cache_names.items() if expiry <= now]:
+            del _cache_names[stale]
+        cached = (cache.name, now + CACHE_TTL_SECONDS - _REFRESH_MARGIN_SECONDS)
+        _cache_names[key] = cached
+        logging.info("[%s] Created context cache %s", callback_context.agent_name, cache.name)
+
+    # Cached content cannot be combined with an inline system instruction or tools
+    config.cached_content = cached[0]
+    config.system_instruction = None
+    config.tools = None
+    return None
@@ -0,0 +1,52 @@
+# Kept identical to gpt-sales/tools/rate_limit.py: the two apps ship as separate packages.
+# Change both copies together; per-app pacing belongs in config, not here.
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from ..config import config
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        # Guards only the refill and reservation, never a sleep. A plain lock is not bound
+        # to an event loop, so runners on separate threads/loops can share the bucket.
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> float:
+        """Reserves a token and sleeps until it is due; returns how long the caller was delayed."""
+        with self._lock:
+            now = time.monotonic()
+            # The balance goes negative to queue callers; each sleeps off its own deficit
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate) - 1
+            self._updated = now
+            delay = max(-self._tokens, 0.0) / self.rate
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+# Shared across every agent that grounds with google_search, so concurrent sub-agents
+# draw from one quota instead of each hitting 429s
+search_bucket = TokenBucket(rate=1000 / config.search_min_interval_ms, capacity=config.search_burst)
+
+
+async def throttle_search_requests(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Paces search-grounded model requests to stay under the provider's QPS limit."""
+    waited = await search_bucket.acquire()
+    if waited:
+        logging.info("[%s] Delayed search request %.2fs for rate limiting", callback_context.agent_name, waited)
+    return None
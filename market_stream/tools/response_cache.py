@@ -0,0 +1,42 @@
+# Kept identical to gpt-sales/tools/response_cache.py: the two apps ship as separate packages.
+# Change both copies together.
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def cache_key(*parts: str) -> str:
+    """Builds a stable cache key from whitespace/case-normalized text parts."""
+    # Hash part by part so large payloads are not first joined into one more copy
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(" ".join(str(part).lower().split()).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after `ttl_seconds`."""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 128):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
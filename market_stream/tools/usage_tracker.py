@@ -0,0 +1,52 @@
+import logging
+from collections import Counter, defaultdict
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+# agent name -> {"requests", "prompt_tokens", "cached_tokens"}
+_usage: defaultdict[str, Counter] = defaultdict(Counter)
+
+
+def record_cache_usage(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """Accumulates prompt and cached-prompt token counts per agent from the response usage.
+
+    Attach to Gemini agents only: the count comes from `cached_content_token_count`,
+    which LiteLLM-backed agents do not reliably populate, so their hit rate would under-report.
+    """
+    usage = llm_response.usage_metadata
+    if usage is None or llm_response.partial:
+        return None
+
+    stats = _usage[callback_context.agent_name]
+    stats["requests"] += 1
+    stats["prompt_tokens"] += usage.prompt_token_count or 0
+    stats["cached_tokens"] += usage.cached_content_token_count or 0
+    logging.debug(
+        "[%s] prompt_tokens=%s cached_tokens=%s",
+        callback_context.agent_name, usage.prompt_token_count, usage.cached_content_token_count,
+    )
+    return None
+
+
+def get_cache_report() -> dict[str, dict[str, float]]:
+    """Returns per-agent request/token totals and the share of prompt tokens served from cache."""
+    return {
+        name: {
+            **stats,
+            "hit_rate": stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0,
+        }
+        for name, stats in _usage.items()
+    }
+
+
+def log_cache_report() -> None:
+    """Logs the per-agent totals from `get_cache_report` (since process start), one line per agent."""
+    for name, stats in get_cache_report().items():
+        logging.info(
+            "[%s] Context cache: %d requests, %d/%d prompt tokens cached (%.0f%%)",
+            name, stats["requests"], stats["cached_tokens"], stats["prompt_tokens"], stats["hit_rate"] * 100,
+        )
@@ -9,8 +9,8 @@ def create_blank_project(client_id: str):
     db = client["sales_reports"]
     collection = db["org_reports"]
 
-    # Check if a document with the same client_id exists
-    existing_doc = collection.find_one({"client_id": client_id})
+    # Check if a document with the same client_id exists; fetch only _id, not the stored reports
+    existing_doc = collection.find_one({"client_id": client_id}, {"_id": 1})
     
     if existing_doc:
         print(f"Document with client_id '{client_id}' already exists.")
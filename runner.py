@@ -52,12 +52,11 @@ class LoggingStream:
         self.level = level
         
     def write(self, data):
-        # Write to original stream (console)
+        # Write to original stream (console); its own buffering decides when to flush
         self.original_stream.write(data)
-        self.original_stream.flush()
-        
-        # Also log to file if it's not just whitespace
-        if data.strip():
+
+        # Also log to file if it's not just whitespace (print() sends the newline as a separate write)
+        if data and not data.isspace():
             self.logger.log(self.level, data.strip())
     
     def flush(self):
@@ -74,7 +73,14 @@ class LoggingStream:
 def setup_stream_capture():
     # Setup logging
     logger = logging.getLogger("console_capture")
-    
+
+    # LoggingStream already echoes to the console, so captured output only goes to the log file;
+    # propagating to the root StreamHandler would print every line a second time
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.FileHandler):
+            logger.addHandler(handler)
+    logger.propagate = False
+
     # Store original streams
     original_stdout = sys.stdout
     original_stderr = sys.stderr
@@ -112,8 +118,9 @@ try:
             host="0.0.0.0",
             port=8501,
             ssl_keyfile="SSLCerts/key.pem",
-            ssl_certfile="SSLCerts/cert.pem",            log_level="info",  # Ensure uvicorn logs at info level
-            access_log=True    # Enable access logging
+            ssl_certfile="SSLCerts/cert.pem",
+            log_level="warning",  # Only surface uvicorn warnings and errors
+            access_log=False      # A formatted record per request costs more than it tells us
         )
 
 except Exception as e: